@@ -11,6 +11,7 @@ from .vars import Var
 from aiohttp import web
 from .server import web_server
 from .utils.keepalive import ping_server
+from .utils.notifier import start_notifier
 from Thunder.bot.clients import initialize_clients
 
 # Setup logging
@@ -25,7 +26,7 @@ logging.getLogger("hydrogram").setLevel(logging.ERROR)
 
 # Plugin path
 ppath = "Thunder/bot/plugins/*.py"
-files = glob.glob(ppath)
+files = sorted(glob.glob(ppath))
 
 async def start_services():
     # Initialize bot
@@ -35,6 +36,7 @@ async def start_services():
         bot_info = await StreamBot.get_me()
         StreamBot.username = bot_info.username
         logging.info('Telegram Bot Initialized as: @%s', StreamBot.username)
+        start_notifier(StreamBot)
     except Exception as e:
         logging.error('Failed to initialize bot: %s', e)
         return
@@ -55,6 +57,10 @@ async def start_services():
             with open(name) as a:
                 patt = Path(a.name)
                 plugin_name = patt.stem
+                if f"Thunder.bot.plugins.{plugin_name}" in sys.modules:
+                    # Executing a plugin twice would register its handlers twice
+                    logging.warning("Plugin %s already loaded, skipping", plugin_name)
+                    continue
                 plugins_dir = Path(f"Thunder/bot/plugins/{plugin_name}.py")
                 import_path = f".plugins.{plugin_name}"
                 spec = importlib.util.spec_from_file_location(import_path, plugins_dir)
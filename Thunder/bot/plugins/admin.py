@@ -14,13 +14,12 @@ from Thunder.bot import StreamBot, multi_clients, work_loads
 from Thunder.vars import Var
 from Thunder import StartTime, __version__
 from Thunder.utils.utils_bot import get_readable_file_size, get_readable_time
-from Thunder.utils.database import Database
+from Thunder.utils.database import get_db
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Initialize the database
-db = Database(Var.DATABASE_URL, Var.name)
+db = get_db()
 broadcast_ids = {}
 
 def generate_unique_id():
@@ -61,7 +60,7 @@ async def get_total_users(client: Client, message: Message):
             disable_web_page_preview=True
         )
     except Exception as e:
-        logging.error(f"Error while fetching total users: {e}")
+        logger.error("Error while fetching total users: %s", e)
         await message.reply_text(
             "🚨 An error occurred while fetching the total users.",
             parse_mode=ParseMode.MARKDOWN,
@@ -118,7 +117,7 @@ async def broadcast_message(client, message):
                 break
 
             except Exception as e:
-                logging.warning(f"Problem sending to {user_id}: {e}")
+                logger.warning("Problem sending to %s: %s", user_id, e)
                 if "bot" in str(e).lower() or "self" in str(e).lower():
                     # Do not retry if issues related to bot/self
                     break
@@ -166,7 +165,7 @@ async def show_status(client: StreamBot, message: Message):
         )
     
     except Exception as e:
-        logging.error(f"Error displaying status: {e}")
+        logger.error("Error displaying status: %s", e)
         await message.reply_text(
             "🚨 An error occurred while retrieving the status.",
             parse_mode=ParseMode.MARKDOWN,
@@ -200,7 +199,7 @@ async def show_stats(client: StreamBot, message: Message):
             disable_web_page_preview=True
         )
     except Exception as e:
-        logging.error(f"Error retrieving bot statistics: {e}")
+        logger.error("Error retrieving bot statistics: %s", e)
         await message.reply_text(
             "🚨 An error occurred while retrieving the statistics.",
             parse_mode=ParseMode.MARKDOWN,
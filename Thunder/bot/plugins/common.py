@@ -1,28 +1,109 @@
+import asyncio
 import logging
-import time
+from time import perf_counter_ns
 from hydrogram import Client, filters
 from hydrogram.types import Message
 from Thunder.bot import StreamBot
 from Thunder.vars import Var
 from Thunder.utils import human_readable, database
+from Thunder.utils.notifier import notify
+from Thunder.utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 # Initialize the database
-db = database.Database(Var.DATABASE_URL, Var.name)
+db = database.get_db()
+
+# Static reply texts, built once at import time
+WELCOME_PHOTO = "https://cdn.jsdelivr.net/gh/fyaz05/Resources@main/FileToLink/Welcome.png"
+
+WELCOME_TEXT = (
+    "**Welcome to the File to Link Bot!**\n\n"
+    "I can convert files into links for you to share easily.\n"
+    "Send me a file or use the commands for more options.\n"
+    "Type /help to see what I can do for you!"
+)
+
+HELP_TEXT = (
+    "**How to use File to Link Bot!**\n"
+    "🔹 Send any file or video to generate a shareable link.\n"
+    "🔹 Use the link for easy downloading or streaming.\n"
+    "🔹 For channel posts: Add me to your channel to generate links automatically for each post.\n"
+    "🔹 Type /about to learn more about this bot.\n"
+    "Enjoy using the bot and feel free to share your feedback!"
+)
+
+ABOUT_TEXT = (
+    "<b>About File to Link Bot</b>\n\n"
+    "🔸 <b>Bot Name:</b> File to Link Bot\n"
+    "🔸 <b>Description:</b> This bot converts your files into direct download and stream links.\n"
+    "🔸 <b>Usage:</b> Send a file to receive a direct link.\n"
+    "🔸 Join our Telegram for updates and support.\n"
+)
+
+DC_TEXT = "Your Telegram DC is: `{dc}`"
+
+NEW_USER_TEXT = "#NEW_USER: \n\nNew User [{name}](tg://user?id={uid}) has started the bot!"
+
+LINK_TEXT = (
+    "**Link Generated! ⚡**\n\n"
+    "📧 **File Name:** {name}\n"
+    "📦 **File Size:** {size}\n\n"
+    "💌 [Download Link]({link})\n\n♻️ This link will work till the bot is active. ♻️"
+)
+
+# Users already known to be in the database (LRU, bounded in size, never expires)
+KNOWN_USERS_MAX = 100_000
+_known_users = TTLCache(maxsize=KNOWN_USERS_MAX, ttl=float("inf"))
 
 async def log_new_user(bot: Client, user_id: int, first_name: str):
     """Log new user and send notification if user is new."""
+    if _known_users.get(user_id):
+        return
     if not await db.is_user_exist(user_id):
         await db.add_user(user_id)
-        await bot.send_message(
-            Var.BIN_CHANNEL,
-            f"#NEW_USER: \n\nNew User [{first_name}](tg://user?id={user_id}) has started the bot!"
-        )
+        notify(NEW_USER_TEXT.format(name=first_name, uid=user_id))
+    _known_users.set(user_id, True)
+
+# Strong references to pending background tasks so they are not garbage collected
+_background_tasks = set()
+
+def _on_background_task_done(task: asyncio.Task):
+    """Drop the finished task and log any error it raised."""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("Background task failed: %s", task.exception())
+
+def schedule_new_user_log(bot: Client, message: Message):
+    """Log the sender in the background so the reply is not held up."""
+    task = asyncio.create_task(log_new_user(bot, message.from_user.id, message.from_user.first_name))
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_task_done)
+
+# Recently fetched BIN_CHANNEL messages and fetches still in progress
+LOG_MESSAGE_TTL = 60
+_log_messages = TTLCache(maxsize=1024, ttl=LOG_MESSAGE_TTL)
+_pending_log_messages = {}
+
+async def get_log_message(bot: Client, msg_id: int) -> Message:
+    """Fetch a BIN_CHANNEL message, sharing one request between concurrent callers."""
+    msg = _log_messages.get(msg_id)
+    if msg is not None:
+        return msg
+    task = _pending_log_messages.get(msg_id)
+    if task is None:
+        task = asyncio.create_task(bot.get_messages(chat_id=Var.BIN_CHANNEL, message_ids=msg_id))
+        _pending_log_messages[msg_id] = task
+        task.add_done_callback(lambda _: _pending_log_messages.pop(msg_id, None))
+    # Shield so one cancelled caller does not cancel the fetch for the others
+    msg = await asyncio.shield(task)
+    if not msg.empty:
+        _log_messages.set(msg_id, msg)
+    return msg
 
 def extract_file_info(message: Message):
     """Extract file information like name and size from the message."""
-    media = message.video or message.document or message.audio
+    media = message.document or message.video or message.audio
     if media:
         return media.file_name, human_readable.humanbytes(media.file_size)
     return None, None
@@ -32,81 +113,62 @@ def create_stream_link(msg_id: int):
     base_link = f"{Var.FQDN}/{msg_id}"
     return f"https://{base_link}" if Var.ON_HEROKU or Var.NO_PORT else f"http://{Var.FQDN}:{Var.PORT}/{base_link}"
 
-@StreamBot.on_message(filters.command("start") & filters.private)
 async def start_command(bot: Client, message: Message):
     """Handle /start command."""
-    await log_new_user(bot, message.from_user.id, message.from_user.first_name)
-    args = message.text.strip().split("_")
+    schedule_new_user_log(bot, message)
+    payload = message.text.rpartition("_")[2] if "_" in message.text else ""
+
+    # A plain /start, "start" or any non-numeric payload gets the welcome text
+    try:
+        msg_id = int(payload)
+    except ValueError:
+        await message.reply_text(text=WELCOME_TEXT)
+        return
 
-    if len(args) == 1 or args[-1].lower() == "start":
+    get_msg = await get_log_message(bot, msg_id)
+    file_name, file_size = extract_file_info(get_msg)
+    stream_link = create_stream_link(get_msg.id)
+
+    if file_name and file_size:
         await message.reply_text(
-            text=(
-                "**Welcome to the File to Link Bot!**\n\n"
-                "I can convert files into links for you to share easily.\n"
-                "Send me a file or use the commands for more options.\n"
-                "Type /help to see what I can do for you!"
-            )
+            text=LINK_TEXT.format(name=file_name, size=file_size, link=stream_link)
         )
-    else:
-        msg_id = int(args[-1])
-        get_msg = await bot.get_messages(chat_id=Var.BIN_CHANNEL, message_ids=msg_id)
-        file_name, file_size = extract_file_info(get_msg)
-        stream_link = create_stream_link(get_msg.id)
-
-        if file_name and file_size:
-            await message.reply_text(
-                text=(
-                    f"**Link Generated! ⚡**\n\n"
-                    f"📧 **File Name:** {file_name}\n"
-                    f"📦 **File Size:** {file_size}\n\n"
-                    f"💌 [Download Link]({stream_link})\n\n♻️ This link will work till the bot is active. ♻️"
-                )
-            )
-
-@StreamBot.on_message(filters.command("help") & filters.private)
+
 async def help_command(bot: Client, message: Message):
     """Handle /help command."""
-    await log_new_user(bot, message.from_user.id, message.from_user.first_name)
-    help_caption = (
-        "**How to use File to Link Bot!**\n"
-        "🔹 Send any file or video to generate a shareable link.\n"
-        "🔹 Use the link for easy downloading or streaming.\n"
-        "🔹 For channel posts: Add me to your channel to generate links automatically for each post.\n"
-        "🔹 Type /about to learn more about this bot.\n"
-        "Enjoy using the bot and feel free to share your feedback!"
-    )
-    await message.reply_photo(
-        photo="https://cdn.jsdelivr.net/gh/fyaz05/Resources@main/FileToLink/Welcome.png",
-        caption=help_caption
-    )
+    schedule_new_user_log(bot, message)
+    await message.reply_photo(photo=WELCOME_PHOTO, caption=HELP_TEXT)
 
-@StreamBot.on_message(filters.command("about") & filters.private)
 async def about_command(bot: Client, message: Message):
     """Handle /about command."""
-    await log_new_user(bot, message.from_user.id, message.from_user.first_name)
-    about_caption = (
-        "<b>About File to Link Bot</b>\n\n"
-        "🔸 <b>Bot Name:</b> File to Link Bot\n"
-        "🔸 <b>Description:</b> This bot converts your files into direct download and stream links.\n"
-        "🔸 <b>Usage:</b> Send a file to receive a direct link.\n"
-        "🔸 Join our Telegram for updates and support.\n"
-    )
-    await message.reply_photo(
-        photo="https://cdn.jsdelivr.net/gh/fyaz05/Resources@main/FileToLink/Welcome.png",
-        caption=about_caption
-    )
+    schedule_new_user_log(bot, message)
+    await message.reply_photo(photo=WELCOME_PHOTO, caption=ABOUT_TEXT)
 
-@StreamBot.on_message(filters.command("dc") & filters.private)
 async def dc_command(bot: Client, message: Message):
     """Handle DC command."""
-    dc_text = f"Your Telegram DC is: `{message.from_user.dc_id}`"
-    await message.reply_text(dc_text, disable_web_page_preview=True, quote=True)
+    await message.reply_text(
+        DC_TEXT.format(dc=message.from_user.dc_id),
+        disable_web_page_preview=True,
+        quote=True
+    )
 
-@StreamBot.on_message(filters.command("ping") & filters.private)
 async def ping_command(bot: Client, message: Message):
     """Handle ping command."""
-    start_time = time.time()
+    start_ns = perf_counter_ns()
     response = await message.reply_text("....")
-    end_time = time.time()
-    time_taken_ms = (end_time - start_time) * 1000
+    time_taken_ms = (perf_counter_ns() - start_ns) / 1_000_000
     await response.edit(f"Pong!\n{time_taken_ms:.3f} ms")
+
+# Single registration for all private commands; one filter check per update
+COMMAND_HANDLERS = {
+    "start": start_command,
+    "help": help_command,
+    "about": about_command,
+    "dc": dc_command,
+    "ping": ping_command,
+}
+
+@StreamBot.on_message(filters.command(list(COMMAND_HANDLERS)) & filters.private)
+async def command_dispatcher(bot: Client, message: Message):
+    """Dispatch private commands to their handler."""
+    await COMMAND_HANDLERS[message.command[0]](bot, message)
@@ -1,53 +1,133 @@
+import json
 import asyncio
+import logging
 from Thunder.bot import StreamBot
-from Thunder.utils.database import Database
+from Thunder.utils.database import get_db, BatchedExistence
 from Thunder.utils.human_readable import humanbytes
+from Thunder.utils.notifier import notify
+from Thunder.utils.cache import TTLCache
 from Thunder.vars import Var
-from urllib.parse import quote_plus
 from hydrogram import filters, Client
 from hydrogram.errors import FloodWait
 from hydrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
-from Thunder.utils.file_properties import get_name, get_hash, get_media_file_size
+from Thunder.utils.file_properties import get_media_from_message, get_name, get_hash, get_unique_id, hash_from_unique_id
 
-# Initialize databases
-db = Database(Var.DATABASE_URL, Var.name)
-pass_db = Database(Var.DATABASE_URL, "ag_passwords")
+# Use the Rust-backed urlquote encoder when installed; resolved once at import.
+# File names are path segments, so spaces become %20 and "/" is always escaped.
+try:
+    from urlquote import quote as _native_quote
+    from urlquote.quoting import PATH_SEGMENT_QUOTING
+
+    def quote_segment(value: str) -> str:
+        return _native_quote(value, PATH_SEGMENT_QUOTING).decode()
+except ImportError:
+    from urllib.parse import quote
+
+    def quote_segment(value: str) -> str:
+        return quote(value, safe='')
+
+logger = logging.getLogger(__name__)
+
+try:
+    from redis.asyncio import Redis
+except ImportError:
+    Redis = None
+
+# Database access is created on first use so importing the plugin opens no connections
+_user_exists = None
+
+def _get_user_exists() -> BatchedExistence:
+    global _user_exists
+    if _user_exists is None:
+        _user_exists = BatchedExistence(get_db())
+    return _user_exists
+
+NEW_USER_TEXT = "👋 <b>Welcome!</b>\n✨ <b>{name}</b> has started using the bot."
+
+# Concurrent checks for one new user share a False result; only the first inserts
+_adding_users = set()
 
 async def register_user(client: Client, message: Message) -> None:
     """Register a new user if not already in the database."""
-    if not await db.is_user_exist(message.from_user.id):
-        await db.add_user(message.from_user.id)
-        await client.send_message(
-            Var.BIN_CHANNEL,
-            f"👋 <b>Welcome!</b>\n✨ <b>{message.from_user.first_name}</b> has started using the bot."
-        )
-
-async def generate_links(log_msg: Message) -> tuple:
-    """Generate streaming and download links with the correct format."""
-    base_url = Var.URL.rstrip("/")  # Ensure no trailing slash
-    file_id = log_msg.id
-    file_name = quote_plus(get_name(log_msg))
-    hash_value = get_hash(log_msg)
-    stream_link = f"{base_url}/watch/{file_id}/{file_name}?hash={hash_value}"
-    online_link = f"{base_url}/{file_id}/{file_name}?hash={hash_value}"
-    return stream_link, online_link
+    user_id = message.from_user.id
+    if await _get_user_exists().exists(user_id) or user_id in _adding_users:
+        return
+    _adding_users.add(user_id)
+    try:
+        await get_db().add_user(user_id)
+    finally:
+        _adding_users.discard(user_id)
+    notify(NEW_USER_TEXT.format(name=message.from_user.first_name))
+
+# Generated links keyed by file_unique_id, so repeat requests skip the forward
+CACHE_MAXSIZE = 10_000
+CACHE_EXPIRY = 24 * 60 * 60  # seconds
+CACHE = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_EXPIRY)
+_pending_links = {}  # file_unique_id -> task creating its links
+
+# Optional second cache level so links survive restarts
+redis_client = None
+if Var.REDIS_URL and Redis is None:
+    logger.warning("REDIS_URL is set but the redis package is not installed; links are cached in memory only")
+elif Var.REDIS_URL:
+    try:
+        redis_client = Redis.from_url(Var.REDIS_URL)
+    except ValueError as e:
+        logger.warning("Invalid REDIS_URL (%s); links are cached in memory only", e)
+# Stored message IDs only resolve in this bot's BIN_CHANNEL, so it is part of the key
+REDIS_KEY_PREFIX = f"lnk:{Var.BIN_CHANNEL}:"
+
+# Resolved once at import; a set keeps the per-post ban check O(1)
+BANNED_CHANNELS = frozenset(Var.BANNED_CHANNELS)
+
+# Link templates, resolved once since Var.URL never changes at runtime
+BASE_URL = Var.URL.rstrip("/")  # Ensure no trailing slash
+STREAM_LINK_TEMPLATE = BASE_URL + "/watch/%s/%s?hash=%s"
+ONLINE_LINK_TEMPLATE = BASE_URL + "/%s/%s?hash=%s"
+
+async def generate_links(log_msg: Message, file_name: str = None, hash_value: str = None) -> tuple:
+    """Generate streaming and download links with the correct format.
+
+    Callers that already know the file name or hash can pass them in to
+    avoid inspecting the message again.
+    """
+    if file_name is None:
+        file_name = get_name(log_msg)
+    if hash_value is None:
+        hash_value = get_hash(log_msg)
+    link_args = (log_msg.id, quote_segment(file_name), hash_value)
+    return STREAM_LINK_TEMPLATE % link_args, ONLINE_LINK_TEMPLATE % link_args
+
+# Admin status per chat; role changes are rare, so a minute of staleness is fine
+ADMIN_CACHE_TTL = 60
+_admin_cache = TTLCache(maxsize=1024, ttl=ADMIN_CACHE_TTL)
 
 async def check_admin_privileges(client: Client, chat_id: int) -> bool:
     """Check if the bot is an admin in the chat; skip for private chats."""
+    is_admin = _admin_cache.get(chat_id)
+    if is_admin is not None:
+        return is_admin
     try:
         chat = await client.get_chat(chat_id)
         if chat.type == 'private':
-            return True  # Admin check not needed in private chats
-        member = await client.get_chat_member(chat_id, client.me.id)
-        return member.status in ("administrator", "creator")
+            is_admin = True  # Admin check not needed in private chats
+        else:
+            member = await client.get_chat_member(chat_id, client.me.id)
+            is_admin = member.status in ("administrator", "creator")
+        _admin_cache.set(chat_id, is_admin)
+        return is_admin
     except Exception as e:
-        print(f"Error checking admin privileges: {e}")
+        logger.error("Error checking admin privileges: %s", e)
         return False
 
+# hydrogram already sleeps through FloodWaits under SLEEP_THRESHOLD, so the ones that
+# reach a handler are long; retry once rather than tie up a dispatcher worker for longer
+FLOOD_WAIT_RETRIES = 2
+
 async def handle_flood_wait(e: FloodWait) -> None:
     """Handle FloodWait exceptions."""
-    print(f"Waiting for {e.x} seconds due to FloodWait.")
-    await asyncio.sleep(e.x)
+    logger.warning("Waiting for %s seconds due to FloodWait.", e.value)
+    await asyncio.sleep(e.value)
 
 @StreamBot.on_message(filters.command("link") & filters.reply)
 async def link_handler(client: Client, message: Message):
@@ -73,83 +153,207 @@ async def private_receive_handler(client: Client, message: Message):
     await register_user(client, message)  # Register the user
     await process_media_message(client, message, message)  # Process the media file
 
-async def process_media_message(client: Client, command_message: Message, media_message: Message):
-    """Process the media message and generate streaming and download links."""
+def links_markup(stream_link: str, online_link: str) -> InlineKeyboardMarkup:
+    """Build the Watch Now / Download keyboard for a pair of links."""
+    return InlineKeyboardMarkup([
+        [InlineKeyboardButton("🖥️ Watch Now", url=stream_link),
+         InlineKeyboardButton("📥 Download", url=online_link)]
+    ])
+
+async def create_links(media_message: Message, file_unique_id: str = None) -> dict:
+    """Forward the media to BIN_CHANNEL and build its link data."""
+    log_msg = await media_message.forward(chat_id=Var.BIN_CHANNEL)  # Forward media to log channel
+    media = get_media_from_message(log_msg)  # Probe the media kinds once for name and size
+    media_name = getattr(media, "file_name", "")
+    media_size_bytes = getattr(media, "file_size", 0)
+    # file_unique_id is the same on the forwarded copy, so the hash can be derived from the key
+    hash_value = hash_from_unique_id(file_unique_id) if file_unique_id else get_hash(log_msg)
+    stream_link, online_link = await generate_links(log_msg, media_name, hash_value)
+    return {
+        "log_msg_id": log_msg.id,
+        "hash_value": hash_value,
+        "media_name": media_name,
+        "media_size_bytes": media_size_bytes,
+        "stream_link": stream_link,
+        "online_link": online_link,
+    }
+
+async def load_links(media_message: Message, cache_key: str) -> dict:
+    """Read link data from Redis, or create it and store it there."""
+    if redis_client is None:
+        return await create_links(media_message, cache_key)
+
+    redis_key = REDIS_KEY_PREFIX + cache_key
     try:
-        log_msg = await media_message.forward(chat_id=Var.BIN_CHANNEL)  # Forward media to log channel
-        stream_link, online_link = await generate_links(log_msg)
-        media_name = get_name(log_msg)
-        media_size = humanbytes(get_media_file_size(media_message))
-
-        # Create a message with the details
-        msg_text = (
-            "🔗 <b>Your Links are Ready!</b>\n\n"
-            f"📄 <b>File Name:</b> <i>{media_name}</i>\n\n"
-            f"📂 <b>File Size:</b> <i>{media_size}</i>\n\n"
-            f"📥 <b>Download Link:</b>\n<code>{online_link}</code>\n\n"
-            f"🖥️ <b>Watch Now:</b>\n<code>{stream_link}</code>\n\n"
-            "⏰ <b>Note:</b> Links are available as long as the bot is active."
-        )
-
-        await command_message.reply_text(
-            msg_text,
-            quote=True,
-            disable_web_page_preview=True,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🖥️ Watch Now", url=stream_link), 
-                 InlineKeyboardButton("📥 Download", url=online_link)]
-            ])
-        )
-
-        # Log information about the request
-        await log_msg.reply_text(
-            f"👤 <b>Requested by:</b> [{command_message.from_user.first_name}](tg://user?id={command_message.from_user.id})\n\n"
-            f"🆔 <b>User ID:</b> `{command_message.from_user.id}`\n\n"
-            f"📥 <b>Download Link:</b> <code>{online_link}</code>\n\n"
-            f"🖥️ <b>Watch Now Link:</b> <code>{stream_link}</code>",
-            disable_web_page_preview=True,
-            quote=True
-        )
-
-    except FloodWait as e:
-        await handle_flood_wait(e)
+        cached = await redis_client.get(redis_key)
+        if cached:
+            return json.loads(cached)
     except Exception as e:
-        print(f"Error processing media message: {e}")
-        await command_message.reply_text("❌ An error occurred. Please try again later.")
+        logger.error("Error reading links from Redis: %s", e)
+
+    data = await create_links(media_message, cache_key)
+    try:
+        await redis_client.set(redis_key, json.dumps(data), ex=CACHE_EXPIRY)
+    except Exception as e:
+        logger.error("Error storing links in Redis: %s", e)
+    return data
+
+async def get_links(media_message: Message) -> dict:
+    """Return cached link data, creating it at most once per file at a time."""
+    cache_key = get_unique_id(media_message)
+    if not cache_key:
+        data = await create_links(media_message)
+        data["reply_markup"] = links_markup(data["stream_link"], data["online_link"])
+        return data
+
+    data = CACHE.get(cache_key)
+    if data is not None:
+        return data
+
+    # Concurrent requests for the same file wait on the first one's forward
+    task = _pending_links.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(load_links(media_message, cache_key))
+        _pending_links[cache_key] = task
+        task.add_done_callback(lambda _: _pending_links.pop(cache_key, None))
+    data = await asyncio.shield(task)
+    # Built here rather than in create_links so the Redis copy stays plain JSON
+    if "reply_markup" not in data:
+        data["reply_markup"] = links_markup(data["stream_link"], data["online_link"])
+    CACHE.set(cache_key, data)
+    return data
+
+LINKS_TEXT = (
+    "🔗 <b>Your Links are Ready!</b>\n\n"
+    "📄 <b>File Name:</b> <i>{media_name}</i>\n\n"
+    "📂 <b>File Size:</b> <i>{media_size}</i>\n\n"
+    "📥 <b>Download Link:</b>\n<code>{online_link}</code>\n\n"
+    "🖥️ <b>Watch Now:</b>\n<code>{stream_link}</code>\n\n"
+    "⏰ <b>Note:</b> Links are available as long as the bot is active."
+)
+
+LOG_TEXT = (
+    "👤 <b>Requested by:</b> [{first_name}](tg://user?id={user_id})\n\n"
+    "🆔 <b>User ID:</b> `{user_id}`\n\n"
+    "📥 <b>Download Link:</b> <code>{online_link}</code>\n\n"
+    "🖥️ <b>Watch Now Link:</b> <code>{stream_link}</code>"
+)
+
+CHANNEL_LOG_TEXT = (
+    "🔘 <b>Channel:</b> `{title}`\n\n"
+    "🆔 <b>Channel ID:</b> `{chat_id}`\n\n"
+    "📥 <b>Download Link:</b> <code>{online_link}</code>\n\n"
+    "🖥️ <b>Watch Now Link:</b> <code>{stream_link}</code>"
+)
+
+async def send_links_to_user(command_message: Message, data: dict) -> None:
+    """Reply to the requester with the file details and links."""
+    await command_message.reply_text(
+        LINKS_TEXT.format(media_size=humanbytes(data["media_size_bytes"]), **data),
+        quote=True,
+        disable_web_page_preview=True,
+        reply_markup=data["reply_markup"]
+    )
+
+async def log_request(client: Client, command_message: Message, data: dict) -> None:
+    """Log the request under the stored BIN_CHANNEL copy of the file."""
+    await client.send_message(
+        Var.BIN_CHANNEL,
+        LOG_TEXT.format(
+            first_name=command_message.from_user.first_name,
+            user_id=command_message.from_user.id,
+            online_link=data["online_link"],
+            stream_link=data["stream_link"]
+        ),
+        disable_web_page_preview=True,
+        reply_to_message_id=data["log_msg_id"]
+    )
+
+async def send_together(sends: dict, required: str) -> None:
+    """Run independent sends concurrently, removing each one from `sends` once done.
+
+    A send that hits FloodWait stays in `sends` so the caller can retry just that one.
+    Any other failure of the `required` send is re-raised; other failures are logged.
+    """
+    names = list(sends)
+    results = await asyncio.gather(*(sends[name]() for name in names), return_exceptions=True)
+    error = flood_wait = None
+    for name, result in zip(names, results):
+        if isinstance(result, FloodWait):
+            flood_wait = result
+            continue
+        del sends[name]
+        if isinstance(result, Exception):
+            if name == required:
+                error = result
+            else:
+                logger.error("Error sending %s: %s", name, result)
+    if error is not None:
+        raise error
+    if flood_wait is not None:
+        raise flood_wait
+
+async def process_media_message(client: Client, command_message: Message, media_message: Message):
+    """Process the media message and generate streaming and download links."""
+    sends = None  # Kept across retries so a send that succeeded is not repeated
+    for attempt in range(FLOOD_WAIT_RETRIES):
+        try:
+            if sends is None:
+                data = await get_links(media_message)
+                sends = {
+                    "link reply": lambda: send_links_to_user(command_message, data),
+                    "request log": lambda: log_request(client, command_message, data),
+                }
+            await send_together(sends, required="link reply")
+            return
+
+        except FloodWait as e:
+            if attempt == FLOOD_WAIT_RETRIES - 1:
+                raise
+            await handle_flood_wait(e)
+        except Exception as e:
+            logger.error("Error processing media message: %s", e, exc_info=True)
+            await command_message.reply_text("❌ An error occurred. Please try again later.")
+            return
 
 @StreamBot.on_message(filters.channel & (filters.document | filters.video | filters.photo) & ~filters.forwarded, group=-1)
 async def channel_receive_handler(bot: Client, broadcast: Message):
     """Handle media shared in a channel."""
-    try:
-        if int(broadcast.chat.id) in Var.BANNED_CHANNELS:
-            await bot.leave_chat(broadcast.chat.id)
-            return
+    log_msg = sends = None
+    for attempt in range(FLOOD_WAIT_RETRIES):
+        try:
+            if broadcast.chat.id in BANNED_CHANNELS:
+                await bot.leave_chat(broadcast.chat.id)
+                return
 
-        log_msg = await broadcast.forward(chat_id=Var.BIN_CHANNEL)
-        stream_link, online_link = await generate_links(log_msg)
-
-        await log_msg.reply_text(
-            f"🔘 <b>Channel:</b> `{broadcast.chat.title}`\n\n"
-            f"🆔 <b>Channel ID:</b> `{broadcast.chat.id}`\n\n"
-            f"📥 <b>Download Link:</b> <code>{online_link}</code>\n\n"
-            f"🖥️ <b>Watch Now Link:</b> <code>{stream_link}</code>",
-            quote=True
-        )
-
-        await bot.edit_message_reply_markup(
-            chat_id=broadcast.chat.id,
-            message_id=broadcast.id,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🖥️ Watch Now", url=stream_link),
-                 InlineKeyboardButton("📥 Download", url=online_link)]
-            ])
-        )
-    except FloodWait as e:
-        await handle_flood_wait(e)
-    except Exception as e:
-        await bot.send_message(
-            chat_id=Var.BIN_CHANNEL,
-            text=f"⚠️ **Error Traceback:** `{e}`",
-            disable_web_page_preview=True
-        )
-        print(f"Error editing broadcast message: {e}")
+            # Keep the forwarded copy and pending sends across retries so nothing is duplicated
+            if log_msg is None:
+                log_msg = await broadcast.forward(chat_id=Var.BIN_CHANNEL)
+            if sends is None:
+                stream_link, online_link = await generate_links(log_msg)
+                sends = {
+                    "channel log": lambda: log_msg.reply_text(
+                        CHANNEL_LOG_TEXT.format(
+                            title=broadcast.chat.title,
+                            chat_id=broadcast.chat.id,
+                            online_link=online_link,
+                            stream_link=stream_link
+                        ),
+                        quote=True
+                    ),
+                    "post buttons": lambda: bot.edit_message_reply_markup(
+                        chat_id=broadcast.chat.id,
+                        message_id=broadcast.id,
+                        reply_markup=links_markup(stream_link, online_link)
+                    ),
+                }
+            await send_together(sends, required="post buttons")
+            return
+        except FloodWait as e:
+            if attempt == FLOOD_WAIT_RETRIES - 1:
+                raise
+            await handle_flood_wait(e)
+        except Exception as e:
+            notify(f"⚠️ **Error Traceback:** `{e}`")
+            logger.error("Error editing broadcast message: %s", e, exc_info=True)
+            return
@@ -3,6 +3,7 @@ from .stream_routes import routes
 
 
 async def web_server():
-    web_app = web.Application(client_max_size=30000000)
+    # Only GET/HEAD routes exist, so request bodies never need more than the 1 MiB default
+    web_app = web.Application(client_max_size=1024 ** 2)
     web_app.add_routes(routes)
     return web_app
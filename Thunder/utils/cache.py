@@ -0,0 +1,39 @@
+from time import monotonic
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """A size-capped LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._od: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a fresh value for `key`, or `default` if missing or expired."""
+        entry = self._od.get(key)
+        if entry is None:
+            return default
+        stored_at, value = entry
+        if monotonic() - stored_at >= self.ttl:
+            del self._od[key]
+            return default
+        self._od.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value` under `key`, evicting least recently used entries if full."""
+        self._od[key] = (monotonic(), value)
+        self._od.move_to_end(key)
+        while len(self._od) > self.maxsize:
+            self._od.popitem(last=False)
+
+    def expire(self) -> int:
+        """Drop all expired entries and return how many were removed."""
+        cutoff = monotonic() - self.ttl
+        expired = [key for key, (stored_at, _) in self._od.items() if stored_at <= cutoff]
+        for key in expired:
+            del self._od[key]
+        return len(expired)
@@ -1,6 +1,8 @@
 import asyncio
 import logging
-from typing import Dict, Union
+from collections import deque
+from functools import lru_cache
+from typing import Union
 
 from hydrogram import Client, raw
 from hydrogram.session import Session, Auth
@@ -10,31 +12,60 @@ from hydrogram.file_id import FileId, FileType, ThumbnailSource
 from Thunder.vars import Var
 from Thunder.bot import work_loads
 from Thunder.server.exceptions import FileNotFound
+from .cache import TTLCache
 from .file_properties import get_file_ids
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
+PREFETCH_PARTS = 3  # GetFile requests kept in flight per stream
+CHANNEL_ID_MASK = 0x7FFFFFFFFFFFFFFF
+
+@lru_cache(maxsize=1024)
+def _peer_for(chat_id: int, chat_access_hash: int) -> Union[raw.types.InputPeerUser, raw.types.InputPeerChat, raw.types.InputPeerChannel]:
+    """Build the input peer for a chat; memoised since the same chats recur."""
+    if chat_id > 0:
+        return raw.types.InputPeerUser(user_id=chat_id, access_hash=chat_access_hash)
+
+    if chat_access_hash == 0:
+        return raw.types.InputPeerChat(chat_id=-chat_id)
+
+    return raw.types.InputPeerChannel(channel_id=chat_id & CHANNEL_ID_MASK, access_hash=chat_access_hash)
+
+# Prefetched parts a finished stream no longer needs. Cancelling Session.send would skip
+# its cleanup of session.results and leak the reply, so they are left to complete here.
+_abandoned_parts = set()
+
+def _abandon_part(request: asyncio.Future) -> None:
+    """Keep an unneeded part referenced until it completes, then drop its result."""
+    _abandoned_parts.add(request)
+    request.add_done_callback(_drop_part)
+
+def _drop_part(request: asyncio.Future) -> None:
+    _abandoned_parts.discard(request)
+    if not request.cancelled():
+        request.exception()  # Mark as retrieved; the stream is over
+
 class ByteStreamer:
     def __init__(self, client: Client):
         self.client = client
-        self.clean_timer = 30 * 60  # Cache clean interval in seconds
-        self.cached_file_ids: Dict[int, FileId] = {}
+        self.clean_timer = 30 * 60  # Cache entry lifetime and sweep interval in seconds
+        self.cached_file_ids = TTLCache(maxsize=4096, ttl=self.clean_timer)
         asyncio.create_task(self.clean_cache())
 
     async def get_file_properties(self, message_id: int) -> FileId:
         """Get file properties from cache or generate if not available."""
-        if message_id not in self.cached_file_ids:
-            self.cached_file_ids[message_id] = await self.generate_file_properties(message_id)
-        return self.cached_file_ids[message_id]
+        file_id = self.cached_file_ids.get(message_id)
+        if file_id is None:
+            file_id = await self.generate_file_properties(message_id)
+            self.cached_file_ids.set(message_id, file_id)
+        return file_id
 
     async def generate_file_properties(self, message_id: int) -> FileId:
         """Fetch and generate file properties for a given message ID."""
         file_id = await get_file_ids(self.client, Var.BIN_CHANNEL, message_id)
         if not file_id:
             raise FileNotFound(f"File with message ID {message_id} not found.")
-        LOGGER.debug(f"Generated and cached file properties for message ID {message_id}.")
+        LOGGER.debug("Generated and cached file properties for message ID %s.", message_id)
         return file_id
 
     async def generate_media_session(self, file_id: FileId) -> Session:
@@ -47,30 +78,34 @@ class ByteStreamer:
 
     async def _create_or_reuse_media_session(self, file_id: FileId) -> Session:
         """Create a new media session or reuse an existing one."""
-        client_dc_id = await self.client.storage.dc_id()
-        
+        storage = self.client.storage
+        client_dc_id = await storage.dc_id()
+        test_mode = await storage.test_mode()
+
         if file_id.dc_id != client_dc_id:
-            session = await self._create_media_session(file_id)
+            session = await self._create_media_session(file_id, test_mode)
             await self._authenticate_session(file_id, session)
         else:
             session = Session(
                 self.client,
                 file_id.dc_id,
-                await self.client.storage.auth_key(),
-                await self.client.storage.test_mode(),
+                await storage.auth_key(),
+                test_mode,
                 is_media=True,
             )
             await session.start()
         
         return session
 
-    async def _create_media_session(self, file_id: FileId) -> Session:
+    async def _create_media_session(self, file_id: FileId, test_mode: bool = None) -> Session:
         """Creates a new media session for a given file."""
+        if test_mode is None:
+            test_mode = await self.client.storage.test_mode()
         session = Session(
             self.client,
             file_id.dc_id,
-            await Auth(self.client, file_id.dc_id, await self.client.storage.test_mode()).create(),
-            await self.client.storage.test_mode(),
+            await Auth(self.client, file_id.dc_id, test_mode).create(),
+            test_mode,
             is_media=True,
         )
         await session.start()
@@ -79,25 +114,24 @@ class ByteStreamer:
     async def _authenticate_session(self, file_id: FileId, session: Session) -> None:
         """Authenticate a session, retrying up to three times if necessary."""
         for attempt in range(3):
+            if attempt > 0:
+                await asyncio.sleep(2 ** (attempt - 1))  # Back off only after a failed attempt
             try:
                 exported_auth = await self.client.invoke(raw.functions.auth.ExportAuthorization(dc_id=file_id.dc_id))
-                LOGGER.debug(f"Attempt {attempt + 1}: Exported auth for DC {file_id.dc_id}")
+                LOGGER.debug("Attempt %s: Exported auth for DC %s", attempt + 1, file_id.dc_id)
 
-                await asyncio.sleep(1)  # Delay for transient issue management
                 await session.send(raw.functions.auth.ImportAuthorization(id=exported_auth.id, bytes=exported_auth.bytes))
-                LOGGER.info(f"Authorization imported successfully for DC {file_id.dc_id}")
+                LOGGER.info("Authorization imported successfully for DC %s", file_id.dc_id)
                 return
 
             except AuthBytesInvalid:
-                LOGGER.warning(f"Attempt {attempt + 1}: Invalid auth bytes for DC {file_id.dc_id}")
+                LOGGER.warning("Attempt %s: Invalid auth bytes for DC %s", attempt + 1, file_id.dc_id)
                 if attempt == 2:
-                    await asyncio.sleep(2)
                     await session.stop()
                     raise
 
             except RPCError as e:
-                LOGGER.error(f"RPC error during auth attempt: {e}")
-                await asyncio.sleep(1)
+                LOGGER.error("RPC error during auth attempt: %s", e)
 
     @staticmethod
     async def get_location(file_id: FileId) -> Union[
@@ -135,30 +169,32 @@ class ByteStreamer:
     @staticmethod
     def _create_chat_peer(file_id: FileId) -> Union[raw.types.InputPeerUser, raw.types.InputPeerChat, raw.types.InputPeerChannel]:
         """Create a chat peer for a given chat ID."""
-        if file_id.chat_id > 0:
-            return raw.types.InputPeerUser(user_id=file_id.chat_id, access_hash=file_id.chat_access_hash)
-
-        if file_id.chat_access_hash == 0:
-            return raw.types.InputPeerChat(chat_id=-file_id.chat_id)
-
-        return raw.types.InputPeerChannel(channel_id=file_id.chat_id & 0x7FFFFFFFFFFFFFFF, access_hash=file_id.chat_access_hash)
+        return _peer_for(file_id.chat_id, file_id.chat_access_hash)
 
     async def yield_file(self, file_id: FileId, index: int, offset: int, first_part_cut: int,
                          last_part_cut: int, part_count: int, chunk_size: int) -> Union[str, None]:
         """Yield chunks of a file, handling cuts at the first and last parts."""
-        client = self.client
         work_loads[index] += 1
-        LOGGER.debug(f"Starting to yield file with client index {index}.")
+        LOGGER.debug("Starting to yield file with client index %s.", index)
 
         media_session = await self.generate_media_session(file_id)
         current_part = 1
         location = await self.get_location(file_id)
 
+        # Keep the next few parts in flight so their round trips overlap
+        pending = deque()
+        next_part = 1
+
         try:
             while current_part <= part_count:
-                response = await media_session.send(
-                    raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size)
-                )
+                while len(pending) < PREFETCH_PARTS and next_part <= part_count:
+                    pending.append(asyncio.ensure_future(media_session.send(
+                        raw.functions.upload.GetFile(location=location, offset=offset, limit=chunk_size)
+                    )))
+                    next_part += 1
+                    offset += chunk_size
+
+                response = await pending.popleft()
                 if not isinstance(response, raw.types.upload.File):
                     break
 
@@ -176,16 +212,17 @@ class ByteStreamer:
                     yield chunk
 
                 current_part += 1
-                offset += chunk_size
         except (TimeoutError, AttributeError) as e:
-            LOGGER.error(f"Error while fetching file part: {e}")
+            LOGGER.error("Error while fetching file part: %s", e)
         finally:
-            LOGGER.debug(f"Finished yielding file, processed {current_part - 1} parts.")
+            for request in pending:
+                _abandon_part(request)
+            LOGGER.debug("Finished yielding file, processed %s parts.", current_part - 1)
             work_loads[index] -= 1
 
     async def clean_cache(self) -> None:
-        """Periodically clean the cache of stored file IDs."""
+        """Periodically drop cached file IDs older than the clean timer."""
         while True:
             await asyncio.sleep(self.clean_timer)
-            self.cached_file_ids.clear()
-            LOGGER.debug("Cache cleaned.")
+            expired = self.cached_file_ids.expire()
+            LOGGER.debug("Cache cleaned, %s expired entries removed.", expired)
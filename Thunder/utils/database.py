@@ -1,10 +1,36 @@
+import asyncio
 import datetime
 import motor.motor_asyncio
+from Thunder.vars import Var
+
+# Connection pool limits for the shared Motor client
+MAX_POOL_SIZE = 50
+MAX_IDLE_TIME_MS = 60_000
+
+_clients = {}
+_instances = {}
+
+def _get_client(uri):
+    """Return the Motor client for a URI, creating it on first use."""
+    if uri not in _clients:
+        _clients[uri] = motor.motor_asyncio.AsyncIOMotorClient(
+            uri,
+            maxPoolSize=MAX_POOL_SIZE,
+            maxIdleTimeMS=MAX_IDLE_TIME_MS
+        )
+    return _clients[uri]
+
+def get_db(database_name=None):
+    """Return the shared Database for a name (defaults to Var.name)."""
+    database_name = database_name or Var.name
+    if database_name not in _instances:
+        _instances[database_name] = Database(Var.DATABASE_URL, database_name)
+    return _instances[database_name]
 
 
 class Database:
     def __init__(self, uri, database_name):
-        self._client = motor.motor_asyncio.AsyncIOMotorClient(uri)
+        self._client = _get_client(uri)
         self.db = self._client[database_name]
         self.col = self.db.users
 
@@ -30,6 +56,10 @@ class Database:
         user = await self.col.find_one({'id': int(id)})
         return True if user else False
 
+    async def get_existing_users(self, ids):
+        cursor = self.col.find({'id': {'$in': [int(i) for i in ids]}}, {'id': 1})
+        return {user['id'] async for user in cursor}
+
     async def total_users_count(self):
         count = await self.col.count_documents({})
         return count
@@ -40,3 +70,43 @@ class Database:
 
     async def delete_user(self, user_id):
         await self.col.delete_many({'id': int(user_id)})
+
+
+class BatchedExistence:
+    """Coalesce is_user_exist checks made within `delay` seconds into one query."""
+
+    def __init__(self, db, delay=0.02):
+        self.db = db
+        self.delay = delay
+        self._pending = {}
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def exists(self, id):
+        id = int(id)
+        future = self._pending.get(id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[id] = loop.create_future()
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.delay, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        task = asyncio.create_task(self._resolve(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, pending):
+        try:
+            existing = await self.db.get_existing_users(pending)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for id, future in pending.items():
+            if not future.done():
+                future.set_result(id in existing)
@@ -6,18 +6,14 @@ from hydrogram.raw.types.messages import Messages
 from Thunder.server.exceptions import FileNotFound
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+logger = logging.getLogger(__name__)
 
 async def parse_file_id(message: Message) -> Optional[FileId]:
     """Extracts and decodes the file ID from a message."""
     media = get_media_from_message(message)
     if media:
         return FileId.decode(media.file_id)
-    logging.warning(f"No media found in message: {message.message_id}")
+    logger.warning("No media found in message: %s", message.id)
     return None
 
 async def parse_file_unique_id(message: Messages) -> Optional[str]:
@@ -25,7 +21,7 @@ async def parse_file_unique_id(message: Messages) -> Optional[str]:
     media = get_media_from_message(message)
     if media:
         return media.file_unique_id
-    logging.warning(f"No media found in message for unique ID extraction.")
+    logger.warning("No media found in message for unique ID extraction.")
     return None
 
 async def get_file_ids(client: Client, chat_id: int, message_id: int) -> Optional[FileId]:
@@ -33,12 +29,12 @@ async def get_file_ids(client: Client, chat_id: int, message_id: int) -> Optiona
     try:
         message = await client.get_messages(chat_id, message_id)
         if message.empty:
-            logging.error("Message is empty; file not found.")
+            logger.error("Message is empty; file not found.")
             raise FileNotFound("Message not found or is empty.")
 
         media = get_media_from_message(message)
         if not media:
-            logging.error("No media in message; cannot fetch file IDs.")
+            logger.error("No media in message; cannot fetch file IDs.")
             raise FileNotFound("No media in message.")
 
         file_unique_id = await parse_file_unique_id(message)
@@ -54,34 +50,43 @@ async def get_file_ids(client: Client, chat_id: int, message_id: int) -> Optiona
         return file_id
 
     except Exception as e:
-        logging.error(f"An error occurred while getting file IDs: {e}")
+        logger.error("An error occurred while getting file IDs: %s", e)
         return None
 
+# Media attributes, most common first for a file-to-link bot so the scan exits early
+MEDIA_TYPES = (
+    "document",
+    "video",
+    "audio",
+    "photo",
+    "animation",
+    "voice",
+    "video_note",
+    "sticker",
+)
+
 def get_media_from_message(message: Message) -> Any:
     """Checks the message for different types of media content."""
-    media_types = (
-        "audio",
-        "document",
-        "photo",
-        "sticker",
-        "animation",
-        "video",
-        "voice",
-        "video_note",
-    )
-
-    for attr in media_types:
+    for attr in MEDIA_TYPES:
         media = getattr(message, attr, None)
         if media:
-            logging.info(f"Media found in message: {attr}")
+            logger.debug("Media found in message: %s", attr)
             return media
-    logging.info("No media types found in the message.")
+    logger.debug("No media types found in the message.")
     return None
 
+def get_unique_id(media_msg: Message) -> str:
+    """Returns the unique file ID of the media, stable across forwards."""
+    media = get_media_from_message(media_msg)
+    return getattr(media, "file_unique_id", "")
+
+def hash_from_unique_id(file_unique_id: str) -> str:
+    """Derives the link hash from a unique file ID."""
+    return file_unique_id[:6]
+
 def get_hash(media_msg: Message) -> str:
     """Generates a hash from the unique file ID of the media."""
-    media = get_media_from_message(media_msg)
-    return getattr(media, "file_unique_id", "")[:6]
+    return hash_from_unique_id(get_unique_id(media_msg))
 
 def get_name(media_msg: Message) -> str:
     """Retrieves the file name from the media if available."""
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from hydrogram import Client
+from Thunder.vars import Var
+
+LOGGER = logging.getLogger(__name__)
+
+NOTIFY_QUEUE_SIZE = 1000
+NOTIFY_BATCH_SIZE = 10  # Events coalesced into one BIN_CHANNEL message
+NOTIFY_BATCH_WAIT = 1  # Seconds to wait for more events before sending
+NOTIFY_SEPARATOR = "\n---\n"
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one message
+
+_queue = None
+_worker = None
+dropped_notifications = 0
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=NOTIFY_QUEUE_SIZE)
+    return _queue
+
+def notify(text: str) -> None:
+    """Queue a BIN_CHANNEL notification without waiting for it to be sent."""
+    global dropped_notifications
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = text[:MAX_MESSAGE_LENGTH - 1] + "…"
+    try:
+        _get_queue().put_nowait(text)
+    except asyncio.QueueFull:
+        dropped_notifications += 1
+        LOGGER.warning("Notification queue full, dropped %s notifications so far", dropped_notifications)
+
+async def notification_worker(client: Client) -> None:
+    """Drain the queue, sending queued events to BIN_CHANNEL in batches."""
+    queue = _get_queue()
+    carried = None  # Event that did not fit the previous batch
+    while True:
+        batch = [carried if carried is not None else await queue.get()]
+        carried = None
+        length = len(batch[0])
+        while len(batch) < NOTIFY_BATCH_SIZE:
+            try:
+                text = await asyncio.wait_for(queue.get(), timeout=NOTIFY_BATCH_WAIT)
+            except asyncio.TimeoutError:
+                break
+            length += len(NOTIFY_SEPARATOR) + len(text)
+            if length > MAX_MESSAGE_LENGTH:
+                carried = text
+                break
+            batch.append(text)
+        try:
+            await client.send_message(
+                Var.BIN_CHANNEL,
+                NOTIFY_SEPARATOR.join(batch),
+                disable_web_page_preview=True
+            )
+        except Exception as e:
+            LOGGER.error("Failed to send %s notifications: %s", len(batch), e)
+
+def start_notifier(client: Client) -> asyncio.Task:
+    """Start the background notification worker."""
+    global _worker
+    if _worker is None or _worker.done():
+        _worker = asyncio.create_task(notification_worker(client))
+    return _worker